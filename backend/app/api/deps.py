@@ -2,10 +2,12 @@ from collections.abc import Generator
 from typing import Annotated
 
 import jwt
-from fastapi import Depends, HTTPException, status
+from aiobotocore.client import AioBaseClient
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
+from redis.asyncio import Redis
 from sqlmodel import Session
 
 from app.core import security
@@ -27,6 +29,24 @@ SessionDep = Annotated[Session, Depends(get_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
+def get_s3_client(request: Request) -> AioBaseClient:
+    # Opened once per process by the app lifespan, see app.api.routes.s3
+    client: AioBaseClient = request.app.state.s3_client
+    return client
+
+
+S3ClientDep = Annotated[AioBaseClient, Depends(get_s3_client)]
+
+
+def get_redis_client(request: Request) -> Redis | None:
+    # Opened next to the S3 client by the app lifespan; None when REDIS_URL is unset
+    client: Redis | None = request.app.state.redis_client
+    return client
+
+
+RedisDep = Annotated[Redis | None, Depends(get_redis_client)]
+
+
 def get_current_user(session: SessionDep, token: TokenDep) -> User:
     try:
         payload = jwt.decode(
@@ -54,4 +74,4 @@ def get_current_active_superuser(current_user: CurrentUser) -> User:
         raise HTTPException(
             status_code=403, detail="The user doesn't have enough privileges"
         )
-    return current_user
\ No newline at end of file
+    return current_user
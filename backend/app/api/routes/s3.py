@@ -1,92 +1,643 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Response
-from fastapi.middleware.cors import CORSMiddleware
-from boto3 import client
-from typing import Optional, List
-import os
+import asyncio
+import csv
+import hashlib
 import logging
+import mimetypes
+import re
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Callable, Coroutine, Sequence
+from contextlib import asynccontextmanager, suppress
+from datetime import datetime, timezone
+from typing import Any, BinaryIO
+
+import aioboto3
+import orjson
+from aiobotocore.client import AioBaseClient
+from aiobotocore.config import AioConfig
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
-from fastapi import Query
+from cachetools import TLRUCache, TTLCache
+from fastapi import (
+    APIRouter,
+    FastAPI,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from fastapi.routing import APIRoute
 from pydantic import BaseModel
-import re
-import csv
-from io import StringIO
-from datetime import datetime
-import json
-import mimetypes
-from io import BytesIO
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.api.deps import RedisDep, S3ClientDep
+from app.core.config import settings
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Configure routers for S3 and R2
-s3_router = APIRouter(prefix="/s3", tags=["s3"])
-r2_router = APIRouter(prefix="/r2", tags=["r2"])
-
-# Configure S3 client (used for both S3 and R2)
-s3_client = client(
-    "s3",
-    region_name="auto",
-    endpoint_url=os.getenv("R2_ENDPOINT", "https://97d91ece470eb7b9aa71ca0c781cfacc.r2.cloudflarestorage.com"),
-    aws_access_key_id=os.getenv("R2_ACCESS_KEY_ID", "5547ff7ffb8f3b16a15d6f38322cd8bd"),
-    aws_secret_access_key=os.getenv("R2_SECRET_ACCESS_KEY", "771014b01093eceb212dfea5eec0673842ca4a39456575ca7ff43f768cf42978")
+# Configure async S3 client (used for both S3 and R2)
+session = aioboto3.Session()
+S3_MAX_POOL_CONNECTIONS = (
+    128  # Must exceed MAX_PARALLEL_LISTINGS plus concurrent requests
 )
+POOL_WARMUP_CONNECTIONS = (
+    32  # Connections opened at startup, below S3_MAX_POOL_CONNECTIONS
+)
+POOL_WARMUP_TIMEOUT = 5  # Seconds the background pool warm-up may take
+S3_CLIENT_CONFIG = AioConfig(
+    max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+    retries={"max_attempts": 3, "mode": "adaptive"},
+    # aiohttp ignores botocore's tcp_keepalive; keep idle pooled connections open instead
+    connector_args={"keepalive_timeout": 60},
+)
+
+
+def create_s3_client() -> Any:
+    """
+    Create the S3 client from settings; use as an async context manager.
+    """
+    return session.client(
+        "s3",
+        region_name="auto",
+        endpoint_url=settings.R2_ENDPOINT,
+        aws_access_key_id=settings.R2_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY,
+        config=S3_CLIENT_CONFIG,
+    )
+
+
+def create_redis_client() -> Redis | None:
+    """
+    Create the optional Redis cache client shared by all workers, or None when REDIS_URL is unset.
+    """
+    return Redis.from_url(str(settings.REDIS_URL)) if settings.REDIS_URL else None
+
+
+@asynccontextmanager
+async def s3_client_lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Open a single S3 client and the Redis cache client on startup, expose them as
+    app.state.s3_client and app.state.redis_client and keep them (and their connection
+    pools) until shutdown. The S3 pool is warmed in the background, so startup doesn't wait on it.
+    """
+    redis_client = create_redis_client()
+    try:
+        async with create_s3_client() as client:
+            app.state.s3_client = client
+            app.state.redis_client = redis_client
+            warm_up = asyncio.create_task(warm_up_connection_pool(client))
+            try:
+                yield
+            finally:
+                warm_up.cancel()
+                with suppress(asyncio.CancelledError):
+                    await warm_up
+    finally:
+        if redis_client is not None:
+            await redis_client.aclose()
+
+
+async def warm_up_connection_pool(client: AioBaseClient) -> None:
+    """
+    Open POOL_WARMUP_CONNECTIONS connections up front with cheap HeadBucket calls so the
+    first requests after startup don't each pay for a TLS handshake. Failures are only logged.
+    """
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                *(
+                    client.head_bucket(Bucket=BUCKET_NAME)
+                    for _ in range(POOL_WARMUP_CONNECTIONS)
+                ),
+                return_exceptions=True,
+            ),
+            timeout=POOL_WARMUP_TIMEOUT,
+        )
+    except asyncio.TimeoutError:
+        logger.warning(
+            "S3 connection pool warm-up timed out after %ss", POOL_WARMUP_TIMEOUT
+        )
+        return
+    failures = [result for result in results if isinstance(result, Exception)]
+    if failures:
+        logger.warning(
+            "S3 connection pool warm-up: %d of %d requests failed: %s",
+            len(failures),
+            len(results),
+            failures[0],
+        )
+
 
 # Constants
 BUCKET_NAME = "iconluxurytoday"
 MAX_UPLOAD_SIZE = 100 * 1024 * 1024  # 100 MB
+MAX_REQUEST_BODY_SIZE = (
+    MAX_UPLOAD_SIZE + 1024 * 1024
+)  # Room for multipart framing around a maximum-size file
 JSON_STORE_PATH = "file_store/file_store.json"
+MAX_PARALLEL_LISTINGS = 16  # Upper bound on concurrent ListObjectsV2 calls per worker
+FOLDER_COUNT_CACHE_TTL = 60  # Seconds a cached folder count stays valid
+FOLDER_COUNT_ESTIMATE_LIMIT = (
+    1000  # Larger folders are reported as "many" by a quick count
+)
+FOLDER_COUNT_LOCAL_CACHE_SIZE = (
+    50_000  # Folder counts kept in process memory per worker
+)
+LIST_PAGE_CACHE_TTL = 20  # Seconds a listing page is served from process memory
+LIST_PAGE_CACHE_SIZE = 10_000  # Listing pages kept in process memory per worker
+LIST_GENERATION_TTL = 3600  # Seconds a folder's listing generation outlives its last change; must cover LIST_PAGE_CACHE_TTL and PAGE_TOKEN_CACHE_TTL
+BATCH_COUNT_MIN_FOLDERS = 4  # Fewer uncached folders than this are counted one by one
+BATCH_COUNT_MAX_PAGES = 10  # Pages a shared subfolder walk may read before falling back
+MAX_SIGN_BATCH_SIZE = 1000  # Upper bound on keys signed by a single batch request
+MAX_SHARDS = 256  # Upper bound on shards accepted by a single sharded listing
+LIST_CACHE_CONTROL = "private, no-cache"  # Listings change with every upload/delete, so browsers must not reuse them
+PAGE_TOKEN_CACHE_TTL = (
+    3600  # Seconds a discovered page -> continuation token mapping is kept
+)
+TOKEN_ID_PATTERN = re.compile(
+    r"[0-9a-f]{32}"
+)  # Shape of the opaque page tokens handed to clients
+DOT_SEGMENT_PATTERN = re.compile(
+    r"(?<![^/])\.{0,2}(?:/|$)"
+)  # An empty, "." or ".." path segment anywhere in a key
+BACKSLASH_TO_SLASH = str.maketrans(
+    "\\", "/"
+)  # Windows-style separators in client paths become key separators
+SIGNED_URL_SAFETY_MARGIN = (
+    300  # A cached signed URL is never handed out with less validity left than this
+)
+SIGNED_URL_LOCAL_CACHE_SIZE = 100_000  # Signed URLs kept in process memory per worker
+DELETE_BATCH_SIZE = 1000  # DeleteObjects accepts at most 1000 keys per request
+MAX_PARALLEL_DELETES = 16  # Upper bound on concurrent DeleteObjects calls per worker
+UPLOAD_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,  # Files from 8 MB up go as multipart uploads
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=8,  # Parts in flight per upload
+)
+
+# Listing errors with a dedicated response; any other error code becomes a 500
+LISTING_ERROR_RESPONSES = {
+    "NoSuchBucket": (404, "Bucket not found"),
+    "InvalidToken": (400, "Invalid continuation token"),
+}
+
+# Shared by every listing coroutine so fan-out never exceeds MAX_PARALLEL_LISTINGS
+listing_semaphore = asyncio.Semaphore(MAX_PARALLEL_LISTINGS)
+delete_semaphore = asyncio.Semaphore(MAX_PARALLEL_DELETES)
+
+# Per-worker caches in front of S3 (and Redis) for repeated browsing of the same folders.
+# Writes through this worker drop the affected entries; cached listing pages are also
+# retired in other workers through the shared generation. Folder counts are only kept
+# here when Redis is not configured, since only Redis sees every worker's invalidations.
+folder_count_local_cache: TTLCache[str, int] = TTLCache(
+    maxsize=FOLDER_COUNT_LOCAL_CACHE_SIZE, ttl=FOLDER_COUNT_CACHE_TTL
+)
+list_page_cache: TTLCache[tuple[Any, ...], dict[str, Any]] = TTLCache(
+    maxsize=LIST_PAGE_CACHE_SIZE, ttl=LIST_PAGE_CACHE_TTL
+)
+
+# Per-worker copy of the URLs this worker signed, keyed by (key, expires_in). Each entry
+# expires SIGNED_URL_SAFETY_MARGIN seconds before its URL does; lookups never extend that.
+signed_url_local_cache: TLRUCache[tuple[str, int], str] = TLRUCache(
+    maxsize=SIGNED_URL_LOCAL_CACHE_SIZE,
+    ttu=lambda cache_key, url, now: now + cache_key[1] - SIGNED_URL_SAFETY_MARGIN,
+)
+
+
+class SizeLimitedReader:
+    """
+    Wrap a file object, counting the bytes read through it and refusing to go past limit.
+    """
+
+    def __init__(self, fileobj: BinaryIO, limit: int):
+        self.fileobj = fileobj
+        self.limit = limit
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.fileobj.read(size)
+        self.bytes_read += len(data)
+        if self.bytes_read > self.limit:
+            raise HTTPException(
+                status_code=413, detail=f"File size exceeds {self.limit} bytes"
+            )
+        return data
+
+
+class BodySizeLimitRoute(APIRoute):
+    """
+    Route that answers 413 when Content-Length exceeds MAX_REQUEST_BODY_SIZE, before
+    FastAPI reads (and spools to disk) the body. SizeLimitedReader still enforces the
+    upload limit when the header is missing or wrong.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def size_limited_handler(request: Request) -> Response:
+            content_length = request.headers.get("content-length", "")
+            if content_length.isdigit() and int(content_length) > MAX_REQUEST_BODY_SIZE:
+                logger.error(
+                    "Request body of %s bytes exceeds maximum %d",
+                    content_length,
+                    MAX_REQUEST_BODY_SIZE,
+                )
+                raise HTTPException(
+                    status_code=413, detail=f"File size exceeds {MAX_UPLOAD_SIZE} bytes"
+                )
+            return await handler(request)
+
+        return size_limited_handler
+
 
 # Pydantic model for delete request
 class DeleteRequest(BaseModel):
-    paths: List[str]
+    paths: list[str]
+
+
+# Pydantic model for batch signing request
+class SignBatchRequest(BaseModel):
+    keys: list[str]
+    expires_in: int = 3600
+
+
+async def cache_get(redis_client: Redis | None, key: str) -> bytes | None:
+    """
+    Read a value from Redis, treating an unavailable cache as a miss.
+    """
+    if redis_client is None:
+        return None
+    try:
+        value: bytes | None = await redis_client.get(key)
+        return value
+    except RedisError as e:
+        logger.warning("Redis GET failed for %s: %s", key, e)
+        return None
+
+
+async def cache_get_many(
+    redis_client: Redis | None, keys: list[str]
+) -> list[bytes | None]:
+    """
+    Read several values from Redis in one round trip, treating an unavailable cache as misses.
+    """
+    if redis_client is None or not keys:
+        return [None] * len(keys)
+    try:
+        values: list[bytes | None] = await redis_client.mget(keys)
+        return values
+    except RedisError as e:
+        logger.warning("Redis MGET failed for %d keys: %s", len(keys), e)
+        return [None] * len(keys)
+
+
+async def cache_set(
+    redis_client: Redis | None, key: str, value: str | int, ttl: int
+) -> bool:
+    """
+    Store a value in Redis with an expiry, ignoring cache failures.
+    Returns whether the value was stored.
+    """
+    if redis_client is None:
+        return False
+    try:
+        await redis_client.setex(key, ttl, value)
+        return True
+    except RedisError as e:
+        logger.warning("Redis SETEX failed for %s: %s", key, e)
+        return False
+
+
+async def cache_set_many(
+    redis_client: Redis | None, values: dict[str, str], ttl: int
+) -> None:
+    """
+    Store several values in Redis with the same expiry in one pipelined round trip,
+    ignoring cache failures.
+    """
+    if redis_client is None or not values:
+        return
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for key, value in values.items():
+                pipe.setex(key, ttl, value)
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning("Redis SETEX pipeline failed for %d keys: %s", len(values), e)
+
+
+async def cache_incr_many(
+    redis_client: Redis | None, keys: list[str], ttl: int
+) -> None:
+    """
+    Increment several counters in Redis in one pipelined round trip, refreshing their
+    expiry and ignoring cache failures.
+    """
+    if redis_client is None or not keys:
+        return
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.incr(key)
+                pipe.expire(key, ttl)
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning("Redis INCR pipeline failed for %d keys: %s", len(keys), e)
+
+
+async def cache_delete(redis_client: Redis | None, keys: list[str]) -> None:
+    """
+    Remove keys from Redis, ignoring cache failures.
+    """
+    if redis_client is None or not keys:
+        return
+    try:
+        await redis_client.delete(*keys)
+    except RedisError as e:
+        logger.warning("Redis DEL failed for %d keys: %s", len(keys), e)
+
+
+def folder_count_cache_key(prefix: str) -> str:
+    return f"s3:count:{prefix}"
+
+
+async def get_cached_folder_counts(
+    redis_client: Redis | None, paths: list[str]
+) -> list[int | None]:
+    """
+    Look up cached counts for folders: in Redis when it is configured, otherwise in this
+    worker's memory. Missing counts are returned as None.
+    """
+    if redis_client is None:
+        return [folder_count_local_cache.get(path) for path in paths]
+    cached = await cache_get_many(
+        redis_client, [folder_count_cache_key(path) for path in paths]
+    )
+    return [None if value is None else int(value) for value in cached]
+
+
+async def cache_folder_counts(
+    redis_client: Redis | None, counts: dict[str, int]
+) -> None:
+    """
+    Cache folder counts for FOLDER_COUNT_CACHE_TTL seconds, in Redis when it is configured,
+    otherwise in this worker's memory.
+    """
+    if redis_client is None:
+        folder_count_local_cache.update(counts)
+        return
+    await cache_set_many(
+        redis_client,
+        {folder_count_cache_key(path): str(count) for path, count in counts.items()},
+        FOLDER_COUNT_CACHE_TTL,
+    )
+
+
+def signed_url_cache_key(key: str, expires_in: int) -> str:
+    return f"s3:sign:{expires_in}:{key}"
+
+
+def token_id_cache_key(token_id: str) -> str:
+    return f"s3:tok:{token_id}"
+
+
+def page_token_cache_key(
+    prefix: str, generation: bytes | None, page_size: int, page: int
+) -> str:
+    # Page boundaries shift when the folder changes, so each generation has its own page map
+    return f"s3:tok:{prefix}:{int(generation or 0)}:{page_size}:{page}"
 
-async def get_folder_count(prefix: str) -> int:
+
+def list_generation_cache_key(prefix: str) -> str:
+    return f"s3:gen:{prefix}"
+
+
+async def invalidate_folder_caches(redis_client: Redis | None, keys: list[str]) -> None:
+    """
+    Drop cached counts and listing pages for every folder containing one of the given object keys.
+    Listing pages cached by other workers are retired by bumping the folder's shared generation.
+    """
+    prefixes = {""}
+    for key in keys:
+        parts = key.split("/")[:-1]
+        for i in range(1, len(parts) + 1):
+            prefixes.add("/".join(parts[:i]) + "/")
+    for prefix in prefixes:
+        folder_count_local_cache.pop(prefix, None)
+    for cache_key in [
+        cache_key for cache_key in list_page_cache if cache_key[0] in prefixes
+    ]:
+        list_page_cache.pop(cache_key, None)
+    await asyncio.gather(
+        cache_delete(
+            redis_client,
+            [folder_count_cache_key(prefix) for prefix in prefixes if prefix],
+        ),
+        cache_incr_many(
+            redis_client,
+            [list_generation_cache_key(prefix) for prefix in prefixes],
+            LIST_GENERATION_TTL,
+        ),
+    )
+
+
+async def get_folder_count(
+    s3_client: AioBaseClient, redis_client: Redis | None, prefix: str
+) -> int:
     """
     Count the number of objects in a folder (prefix) by listing all objects.
+    Results are cached for FOLDER_COUNT_CACHE_TTL seconds.
     """
+    [cached] = await get_cached_folder_counts(redis_client, [prefix])
+    if cached is not None:
+        return cached
     try:
         count = 0
-        continuation_token = None
-        while True:
-            params = {
-                "Bucket": BUCKET_NAME,
-                "Prefix": prefix,
-                "MaxKeys": 1000,
-            }
-            if continuation_token:
-                params["ContinuationToken"] = continuation_token
-            response = s3_client.list_objects_v2(**params)
-            count += len(response.get("Contents", []))
-            continuation_token = response.get("NextContinuationToken")
-            if not continuation_token:
-                break
-        return count
+        paginator = s3_client.get_paginator("list_objects_v2")
+        # A folder's pages are sequential anyway, so one permit covers the whole walk
+        async with listing_semaphore:
+            async for page in paginator.paginate(
+                Bucket=BUCKET_NAME,
+                Prefix=prefix,
+                FetchOwner=False,
+                PaginationConfig={"PageSize": 1000},
+            ):
+                count += int(page.get("KeyCount", 0))
     except Exception as e:
-        logger.error(f"Error counting objects in folder {prefix}: {str(e)}")
+        logger.error("Error counting objects in folder %s: %s", prefix, e)
         return 0
+    await cache_folder_counts(redis_client, {prefix: count})
+    return count
+
+
+async def estimate_folder_count(
+    s3_client: AioBaseClient, redis_client: Redis | None, prefix: str
+) -> int | str:
+    """
+    Count a folder with a single listing call: the exact count when it holds at most
+    FOLDER_COUNT_ESTIMATE_LIMIT objects, otherwise "many". Cached exact counts are reused.
+    """
+    [cached] = await get_cached_folder_counts(redis_client, [prefix])
+    if cached is not None:
+        return cached
+    try:
+        async with listing_semaphore:
+            response = await s3_client.list_objects_v2(
+                Bucket=BUCKET_NAME,
+                Prefix=prefix,
+                MaxKeys=FOLDER_COUNT_ESTIMATE_LIMIT,
+                FetchOwner=False,
+            )
+    except Exception as e:
+        logger.error("Error estimating objects in folder %s: %s", prefix, e)
+        return 0
+    if response.get("IsTruncated"):
+        return "many"
+    # The whole folder fit in one page, so this is an exact count worth caching
+    count = int(response.get("KeyCount", 0))
+    await cache_folder_counts(redis_client, {prefix: count})
+    return count
+
+
+async def count_all_subfolders(
+    s3_client: AioBaseClient, prefix: str, first: str, last: str
+) -> tuple[Counter[str], str | None]:
+    """
+    Count objects per immediate subfolder of prefix with a single recursive listing.
+    Only the key range from subfolder `first` through `last` is read, for at most
+    BATCH_COUNT_MAX_PAGES pages. Returns the counts and, when the page budget ran out,
+    the last key read (relative to prefix); counts for folders sorting before it are complete.
+    """
+    counts: Counter[str] = Counter()
+    prefix_len = len(prefix)
+    last_folder = last + "/"
+    last_folder_len = len(last_folder)
+    params: dict[str, Any] = {
+        "Bucket": BUCKET_NAME,
+        "Prefix": prefix,
+        "StartAfter": prefix + first,
+        "MaxKeys": 1000,
+        "FetchOwner": False,
+    }
+    for _ in range(BATCH_COUNT_MAX_PAGES):
+        async with listing_semaphore:
+            response = await s3_client.list_objects_v2(**params)
+        rel_key = None
+        for obj in response.get("Contents", []):
+            rel_key = obj["Key"][prefix_len:]
+            if rel_key[:last_folder_len] > last_folder:
+                return counts, None
+            folder, sep, _ = rel_key.partition("/")
+            # Files directly under prefix belong to no subfolder, even when one shares their name
+            if sep:
+                counts[folder] += 1
+        continuation_token = response.get("NextContinuationToken")
+        if not continuation_token:
+            return counts, None
+        params["ContinuationToken"] = continuation_token
+    return counts, rel_key
+
+
+async def get_folder_counts(
+    s3_client: AioBaseClient,
+    redis_client: Redis | None,
+    prefix: str,
+    folder_paths: list[str],
+) -> list[int]:
+    """
+    Count objects in sibling folders of prefix. When enough of them are uncached, one
+    recursive listing is shared between them instead of walking each folder separately.
+    """
+    cached = await get_cached_folder_counts(redis_client, folder_paths)
+    counts = {
+        path: count
+        for path, count in zip(folder_paths, cached, strict=True)
+        if count is not None
+    }
+    missing = [path for path in folder_paths if path not in counts]
+
+    if len(missing) >= BATCH_COUNT_MIN_FOLDERS:
+        prefix_len = len(prefix)
+        try:
+            subfolder_counts, last_read = await count_all_subfolders(
+                s3_client,
+                prefix,
+                missing[0][prefix_len:-1],
+                missing[-1][prefix_len:-1],
+            )
+        except Exception as e:
+            logger.error("Error counting subfolders of %s: %s", prefix, e)
+        else:
+            for path in missing:
+                rel_path = path[prefix_len:]
+                if last_read is None or (
+                    rel_path < last_read and not last_read.startswith(rel_path)
+                ):
+                    counts[path] = subfolder_counts[rel_path[:-1]]
+            await cache_folder_counts(
+                redis_client, {path: counts[path] for path in missing if path in counts}
+            )
+            missing = [path for path in missing if path not in counts]
+
+    # Folders the shared walk did not finish are counted individually
+    remaining = await asyncio.gather(
+        *(get_folder_count(s3_client, redis_client, path) for path in missing)
+    )
+    counts.update(zip(missing, remaining, strict=True))
+    return [counts[path] for path in folder_paths]
+
+
+def folder_walk_params(prefix: str) -> dict[str, Any]:
+    """
+    Paginator arguments for walking the direct children of prefix. Nested keys are rolled
+    up into CommonPrefixes and the folder placeholder (key == prefix) is skipped by S3,
+    so Contents needs no per-key filtering beyond dropping an empty name.
+    """
+    params: dict[str, Any] = {
+        "Bucket": BUCKET_NAME,
+        "Prefix": prefix,
+        "Delimiter": "/",
+        "FetchOwner": False,
+        "PaginationConfig": {"PageSize": 1000},
+    }
+    if prefix.endswith("/"):
+        params["StartAfter"] = prefix
+    return params
+
 
 # Function to read JSON store
-async def read_json_store():
+async def read_json_store(s3_client: AioBaseClient) -> dict[str, Any]:
     try:
-        response = s3_client.get_object(Bucket=BUCKET_NAME, Key=JSON_STORE_PATH)
-        content = response["Body"].read().decode("utf-8")
-        return json.loads(content)
+        response = await s3_client.get_object(Bucket=BUCKET_NAME, Key=JSON_STORE_PATH)
+        async with response["Body"] as stream:
+            content = await stream.read()
+        # The store lists every object in the bucket; parse it off the event loop
+        store: dict[str, Any] = await asyncio.to_thread(orjson.loads, content)
+        return store
     except ClientError as e:
         if e.response["Error"]["Code"] == "NoSuchKey":
-            logger.info("JSON store not found, returning empty store")
+            logger.debug("JSON store not found, returning empty store")
             return {"objects": [], "hasMore": False, "nextContinuationToken": None}
-        logger.error(f"Error reading JSON store: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to read JSON store: {str(e)}")
+        logger.error("Error reading JSON store: %s", e)
+        raise HTTPException(
+            status_code=500, detail=f"Failed to read JSON store: {str(e)}"
+        )
     except Exception as e:
-        logger.error(f"Unexpected error reading JSON store: {str(e)}")
+        logger.error("Unexpected error reading JSON store: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+
 # Function to update JSON store
-async def update_json_store(new_objects: List[dict]):
+async def update_json_store(
+    s3_client: AioBaseClient, new_objects: list[dict[str, Any]]
+) -> None:
     try:
         # Read current JSON store
-        current_store = await read_json_store()
+        current_store = await read_json_store(s3_client)
         current_objects = {obj["path"]: obj for obj in current_store.get("objects", [])}
 
         # Update with new objects (add or update)
@@ -97,173 +648,450 @@ async def update_json_store(new_objects: List[dict]):
         updated_objects = list(current_objects.values())
 
         # Write back to S3
-        json_data = json.dumps({
-            "objects": updated_objects,
-            "hasMore": False,  # Since we're storing all objects
-            "nextContinuationToken": None
-        })
-        s3_client.put_object(
+        json_data = await asyncio.to_thread(
+            orjson.dumps,
+            {
+                "objects": updated_objects,
+                "hasMore": False,  # Since we're storing all objects
+                "nextContinuationToken": None,
+            },
+        )
+        await s3_client.put_object(
             Bucket=BUCKET_NAME,
             Key=JSON_STORE_PATH,
-            Body=json_data.encode("utf-8"),
-            ContentType="application/json"
+            Body=json_data,
+            ContentType="application/json",
         )
-        logger.info(f"Updated JSON store at {JSON_STORE_PATH}")
+        logger.debug("Updated JSON store at %s", JSON_STORE_PATH)
     except Exception as e:
-        logger.error(f"Error updating JSON store: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to update JSON store: {str(e)}")
+        logger.error("Error updating JSON store: %s", e)
+        raise HTTPException(
+            status_code=500, detail=f"Failed to update JSON store: {str(e)}"
+        )
+
 
 # One-time function to fetch and add existing records to JSON store
-async def sync_existing_objects(prefix: str = ""):
+async def sync_existing_objects(
+    s3_client: AioBaseClient, redis_client: Redis | None, prefix: str = ""
+) -> dict[str, Any]:
     """
     Fetch all existing objects from S3 and add them to the JSON store.
     """
     try:
-        all_objects = []
-        continuation_token = None
-        while True:
-            params = {
-                "Bucket": BUCKET_NAME,
-                "Prefix": prefix,
-                "Delimiter": "/",
-                "MaxKeys": 1000,
-            }
-            if continuation_token:
-                params["ContinuationToken"] = continuation_token
-            response = s3_client.list_objects_v2(**params)
-
+        all_objects: list[dict[str, Any]] = []
+        folders: list[dict[str, Any]] = []
+        prefix_len = len(prefix)
+        paginator = s3_client.get_paginator("list_objects_v2")
+        async for response in paginator.paginate(**folder_walk_params(prefix)):
             # Process folders
             for common_prefix in response.get("CommonPrefixes", []):
                 folder_path = common_prefix["Prefix"]
                 folder_name = folder_path.rstrip("/").split("/")[-1]
                 if folder_name:
-                    count = await get_folder_count(folder_path)
-                    all_objects.append({
+                    folder = {
                         "type": "folder",
                         "name": folder_name,
                         "path": folder_path,
-                        "count": count,
-                        "lastModified": None
-                    })
+                        "count": None,
+                        "lastModified": None,
+                    }
+                    folders.append(folder)
+                    all_objects.append(folder)
 
             # Process files
-            for obj in response.get("Contents", []):
-                key = obj["Key"]
-                if key != prefix and not key.endswith("/"):
-                    file_name = key.replace(prefix, "", 1).lstrip("/")
-                    if file_name:
-                        all_objects.append({
-                            "type": "file",
-                            "name": file_name,
-                            "path": key,
-                            "size": obj["Size"],
-                            "lastModified": obj["LastModified"].isoformat(),
-                            "count": None
-                        })
+            all_objects.extend(
+                {
+                    "type": "file",
+                    "name": file_name,
+                    "path": key,
+                    "size": obj["Size"],
+                    "lastModified": obj["LastModified"].isoformat(),
+                    "count": None,
+                }
+                for obj in response.get("Contents", ())
+                if (file_name := (key := obj["Key"])[prefix_len:])
+            )
 
-            continuation_token = response.get("NextContinuationToken")
-            if not continuation_token:
-                break
+        # Count every folder at once rather than one listing walk after another
+        counts = await get_folder_counts(
+            s3_client, redis_client, prefix, [folder["path"] for folder in folders]
+        )
+        for folder, count in zip(folders, counts, strict=True):
+            folder["count"] = count
 
         # Update JSON store with all objects
-        await update_json_store(all_objects)
-        logger.info(f"Synced {len(all_objects)} objects to JSON store for prefix: {prefix}")
+        await update_json_store(s3_client, all_objects)
+        logger.debug(
+            "Synced %d objects to JSON store for prefix: %s", len(all_objects), prefix
+        )
         return {
             "message": f"Successfully synced {len(all_objects)} objects to JSON store",
-            "objects_synced": len(all_objects)
+            "objects_synced": len(all_objects),
         }
-    except s3_client.exceptions.NoSuchBucket as e:
-        logger.error(f"Bucket not found: {str(e)}")
-        raise HTTPException(status_code=404, detail="Bucket not found")
-    except s3_client.exceptions.ClientError as e:
-        logger.error(f"Client error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Storage error: {str(e)}")
+    except HTTPException:
+        raise
+    except ClientError as e:
+        raise listing_error(e)
     except Exception as e:
-        logger.error(f"Unexpected error syncing objects: {str(e)}")
+        logger.error("Unexpected error syncing objects: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
-def sanitize_path(path: str) -> str:
-    """Sanitize the path to prevent directory traversal and invalid characters."""
-    clean_path = os.path.normpath(path.lstrip("/")).replace("\\", "/")
-    if clean_path.startswith("..") or "/.." in clean_path:
+
+def listing_error(e: ClientError) -> HTTPException:
+    """
+    Map a ClientError from a listing call to the HTTP error returned to the client.
+    """
+    error_code = e.response.get("Error", {}).get("Code")
+    logger.error("Client error: %s", e)
+    if error_code in LISTING_ERROR_RESPONSES:
+        status_code, detail = LISTING_ERROR_RESPONSES[error_code]
+        return HTTPException(status_code=status_code, detail=detail)
+    return HTTPException(status_code=500, detail=f"Storage error: {str(e)}")
+
+
+def folder_basename(folder_path: str) -> str:
+    """Return the last segment of a folder prefix, e.g. "a/b/" -> "b"."""
+    return folder_path.rstrip("/").split("/")[-1]
+
+
+def drop_dot_segment(match: re.Match[str]) -> str:
+    if match.group().startswith(".."):
         raise ValueError("Invalid path: contains parent directory references")
+    return ""
+
+
+def sanitize_path(path: str) -> str:
+    """
+    Sanitize the path to prevent directory traversal and invalid characters.
+    Leading slashes and empty or "." segments are dropped, so "a//./b" becomes "a/b";
+    a trailing slash is kept because it marks a folder. A path that names nothing,
+    such as "/" or "./", is rejected rather than turned into an empty key.
+    """
+    clean_path = DOT_SEGMENT_PATTERN.sub(
+        drop_dot_segment, path.translate(BACKSLASH_TO_SLASH)
+    )
+    if not clean_path:
+        raise ValueError("Invalid path: does not name an object or folder")
     return clean_path
 
-async def list_objects(prefix: str = "", page: int = 1, page_size: int = 10, continuation_token: Optional[str] = None):
+
+async def resolve_continuation_token(redis_client: Redis | None, token: str) -> str:
+    """
+    Map an opaque token id issued by issue_continuation_token back to the S3 token.
+    Anything that isn't a known id is passed through unchanged.
+    """
+    if TOKEN_ID_PATTERN.fullmatch(token):
+        real_token = await cache_get(redis_client, token_id_cache_key(token))
+        if real_token is not None:
+            return real_token.decode("utf-8")
+    return token
+
+
+async def issue_continuation_token(
+    redis_client: Redis | None, prefix: str, last_key: str, token: str
+) -> str:
+    """
+    Replace an S3 continuation token with a stable id derived from where the page ended,
+    so the same position always yields the same token. Falls back to the raw S3 token
+    when it can't be stored.
+    """
+    token_id = hashlib.md5(
+        f"{prefix}|{last_key}".encode(), usedforsecurity=False
+    ).hexdigest()
+    if await cache_set(
+        redis_client, token_id_cache_key(token_id), token, PAGE_TOKEN_CACHE_TTL
+    ):
+        return token_id
+    return token
+
+
+async def list_objects(
+    s3_client: AioBaseClient,
+    redis_client: Redis | None,
+    prefix: str = "",
+    page: int = 1,
+    page_size: int = 10,
+    continuation_token: str | None = None,
+    include_counts: bool = False,
+) -> dict[str, Any]:
     """
     List objects and folders with pagination.
+    Pages are addressed by the continuation token returned with the previous page;
+    when it is omitted for page > 1, a token remembered from an earlier walk is used.
+    Page 1 always starts at the beginning of the prefix, whatever token is sent with it.
+    Folder counts are left as None unless include_counts is set; clients can fetch
+    them per folder from the folder-count endpoint instead.
     """
     try:
         if page < 1 or page_size < 1:
             raise HTTPException(status_code=400, detail="Invalid page or page_size")
 
-        params = {
+        if page == 1:
+            # The frontend resends its last token along with page=1 when it reloads a folder
+            continuation_token = None
+
+        # Pages cached in process memory are only reused while no worker has changed the folder since
+        generation = await cache_get(redis_client, list_generation_cache_key(prefix))
+        list_cache_key = (
+            prefix,
+            page,
+            page_size,
+            continuation_token,
+            include_counts,
+            generation,
+        )
+        cached_page = list_page_cache.get(list_cache_key)
+        if cached_page is not None:
+            return cached_page
+
+        # Only a page reached by its number is known to be that page; a client-supplied
+        # token may belong to any page, so its successor is not recorded in the page map
+        resolved_by_page = page == 1
+        if not continuation_token and page > 1:
+            cached_token = await cache_get(
+                redis_client, page_token_cache_key(prefix, generation, page_size, page)
+            )
+            if cached_token is not None:
+                continuation_token = cached_token.decode("utf-8")
+                resolved_by_page = True
+        if continuation_token:
+            continuation_token = await resolve_continuation_token(
+                redis_client, continuation_token
+            )
+
+        params: dict[str, Any] = {
             "Bucket": BUCKET_NAME,
             "Prefix": prefix,
             "Delimiter": "/",
             "MaxKeys": page_size,
+            "FetchOwner": False,
         }
-        if page > 1 and continuation_token:
+        if continuation_token:
             params["ContinuationToken"] = continuation_token
+        elif prefix:
+            # Skip the folder placeholder object (key == prefix) on the server
+            params["StartAfter"] = prefix
 
-        response = s3_client.list_objects_v2(**params)
-
-        folders = []
-        for common_prefix in response.get("CommonPrefixes", []):
-            folder_path = common_prefix["Prefix"]
-            folder_name = folder_path.rstrip("/").split("/")[-1]
-            if folder_name:
-                count = await get_folder_count(folder_path)
-                folders.append({
-                    "type": "folder",
-                    "name": folder_name,
-                    "path": folder_path,
-                    "count": count,
-                    "lastModified": None
-                })
-
-        files = []
-        for obj in response.get("Contents", []):
-            key = obj["Key"]
-            if key != prefix and not key.endswith("/"):
-                file_name = key.replace(prefix, "", 1).lstrip("/")
-                if file_name:
-                    files.append({
-                        "type": "file",
-                        "name": file_name,
-                        "path": key,
-                        "size": obj["Size"],
-                        "lastModified": obj["LastModified"].isoformat(),
-                        "count": None
-                    })
+        response = await s3_client.list_objects_v2(**params)
+
+        folder_entries = [
+            (folder_name, folder_path)
+            for common_prefix in response.get("CommonPrefixes", ())
+            if (folder_name := folder_basename(folder_path := common_prefix["Prefix"]))
+        ]
+        counts: Sequence[int | None]
+        if include_counts:
+            counts = await get_folder_counts(
+                s3_client,
+                redis_client,
+                prefix,
+                [folder_path for _, folder_path in folder_entries],
+            )
+        else:
+            counts = [None] * len(folder_entries)
+        folders = [
+            {
+                "type": "folder",
+                "name": folder_name,
+                "path": folder_path,
+                "count": count,
+                "lastModified": None,
+            }
+            for (folder_name, folder_path), count in zip(
+                folder_entries, counts, strict=True
+            )
+        ]
+
+        # Keys always start with prefix, so slice it off instead of searching for it.
+        # With Delimiter="/" any other key containing "/" after the prefix is rolled up
+        # into CommonPrefixes, so no per-key filtering is needed.
+        prefix_len = len(prefix)
+        files = [
+            {
+                "type": "file",
+                "name": obj["Key"][prefix_len:],
+                "path": obj["Key"],
+                "size": obj["Size"],
+                "lastModified": obj["LastModified"],  # Serialized natively by orjson
+            }
+            for obj in response.get("Contents", ())
+        ]
 
         objects = folders + files
         has_more = response.get("IsTruncated", False)
         next_continuation_token = response.get("NextContinuationToken")
+        if next_continuation_token:
+            # The page ends at whichever of its last file or last folder sorts later
+            last_key = max(
+                response["Contents"][-1]["Key"] if response.get("Contents") else "",
+                response["CommonPrefixes"][-1]["Prefix"]
+                if response.get("CommonPrefixes")
+                else "",
+            )
+            next_continuation_token = await issue_continuation_token(
+                redis_client, prefix, last_key, next_continuation_token
+            )
+            if resolved_by_page:
+                await cache_set(
+                    redis_client,
+                    page_token_cache_key(prefix, generation, page_size, page + 1),
+                    next_continuation_token,
+                    PAGE_TOKEN_CACHE_TTL,
+                )
 
-        return {
+        result = {
             "objects": objects,
             "hasMore": has_more,
             "nextContinuationToken": next_continuation_token,
-            "totalItems": len(objects),
+            "totalItems": response.get("KeyCount", len(objects)),
             "page": page,
-            "pageSize": page_size
+            "pageSize": page_size,
         }
+        list_page_cache[list_cache_key] = result
+        return result
 
-    except s3_client.exceptions.NoSuchBucket as e:
-        logger.error(f"Bucket not found: {str(e)}")
-        raise HTTPException(status_code=404, detail="Bucket not found")
-    except s3_client.exceptions.ClientError as e:
-        logger.error(f"Client error: {str(e)}")
-        error_code = e.response.get("Error", {}).get("Code")
-        if error_code == "InvalidToken":
-            raise HTTPException(status_code=400, detail="Invalid continuation token")
-        raise HTTPException(status_code=500, detail=f"Storage error: {str(e)}")
+    except HTTPException:
+        raise
+    except ClientError as e:
+        raise listing_error(e)
+    except Exception as e:
+        logger.error("Unexpected error: %s", e)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+async def list_shard(
+    s3_client: AioBaseClient,
+    prefix: str,
+    shard_prefix: str,
+    shard_semaphore: asyncio.Semaphore,
+) -> list[dict[str, Any]]:
+    """
+    List every file under shard_prefix, following continuation tokens to the end.
+    """
+    prefix_len = len(prefix)
+    files: list[dict[str, Any]] = []
+    params: dict[str, Any] = {
+        "Bucket": BUCKET_NAME,
+        "Prefix": shard_prefix,
+        "MaxKeys": 1000,
+        "FetchOwner": False,
+    }
+    async with shard_semaphore:
+        while True:
+            async with listing_semaphore:
+                response = await s3_client.list_objects_v2(**params)
+            files.extend(
+                {
+                    "type": "file",
+                    "name": file_name,
+                    "path": key,
+                    "size": obj["Size"],
+                    "lastModified": obj["LastModified"],
+                }
+                for obj in response.get("Contents", ())
+                if not (key := obj["Key"]).endswith("/")
+                and (file_name := key[prefix_len:].lstrip("/"))
+            )
+            continuation_token = response.get("NextContinuationToken")
+            if not continuation_token:
+                return files
+            params["ContinuationToken"] = continuation_token
+
+
+async def list_objects_sharded(
+    s3_client: AioBaseClient,
+    prefix: str,
+    shards: list[str],
+    max_parallel_listings: int = MAX_PARALLEL_LISTINGS,
+) -> dict[str, Any]:
+    """
+    Recursively list every file under prefix + shard for each shard in parallel and merge the results.
+    Intended for full enumerations (exports, recovery) where the caller knows how keys are
+    distributed, e.g. shards a..z under a folder. Each shard is a separate paginated walk, so
+    cost is one ListObjectsV2 request per 1000 keys per shard and the whole result is returned
+    at once; overlapping shards are listed twice and then de-duplicated.
+    """
+    if not shards:
+        raise HTTPException(status_code=400, detail="At least one shard is required")
+    if len(shards) > MAX_SHARDS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {MAX_SHARDS} shards are allowed"
+        )
+    if max_parallel_listings < 1 or max_parallel_listings > MAX_PARALLEL_LISTINGS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"max_parallel_listings must be between 1 and {MAX_PARALLEL_LISTINGS}",
+        )
+    try:
+        shard_semaphore = asyncio.Semaphore(max_parallel_listings)
+        results = await asyncio.gather(
+            *(
+                list_shard(s3_client, prefix, prefix + shard, shard_semaphore)
+                for shard in dict.fromkeys(shards)
+            )
+        )
+        merged = {file["path"]: file for files in results for file in files}
+        objects = [merged[path] for path in sorted(merged)]
+        return {"objects": objects, "totalItems": len(objects), "shards": len(results)}
+
+    except ClientError as e:
+        raise listing_error(e)
     except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
+        logger.error("Unexpected error listing shards: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
-async def get_signed_url(key: str, expires_in: int = 3600):
+
+async def presign_get_urls(
+    s3_client: AioBaseClient,
+    redis_client: Redis | None,
+    keys: list[str],
+    expires_in: int,
+) -> list[str]:
+    """
+    Sign GET URLs for objects. Signing is local HMAC work; no request is sent to S3.
+    A URL is reused from process memory, then Redis, until SIGNED_URL_SAFETY_MARGIN seconds
+    before it expires, so repeated loads of the same asset get the same (browser/CDN cacheable) URL.
+    """
+    cache_ttl = expires_in - SIGNED_URL_SAFETY_MARGIN
+    signed_urls: list[str | None]
+    if cache_ttl <= 0:
+        signed_urls = [None] * len(keys)
+    else:
+        signed_urls = [signed_url_local_cache.get((key, expires_in)) for key in keys]
+        missing = [i for i, url in enumerate(signed_urls) if url is None]
+        if missing:
+            # Redis doesn't say how long a shared URL has left, so those aren't copied locally
+            cached = await cache_get_many(
+                redis_client,
+                [signed_url_cache_key(keys[i], expires_in) for i in missing],
+            )
+            for i, url in zip(missing, cached, strict=True):
+                if url is not None:
+                    signed_urls[i] = url.decode("utf-8")
+    urls: list[str] = []
+    fresh_urls: dict[str, str] = {}
+    for key, signed_url in zip(keys, signed_urls, strict=True):
+        if signed_url is None:
+            signed_url = await s3_client.generate_presigned_url(
+                ClientMethod="get_object",
+                Params={"Bucket": BUCKET_NAME, "Key": key},
+                ExpiresIn=expires_in,
+            )
+            if cache_ttl > 0:
+                signed_url_local_cache[(key, expires_in)] = signed_url
+                fresh_urls[signed_url_cache_key(key, expires_in)] = signed_url
+        urls.append(signed_url)
+    if fresh_urls:
+        await cache_set_many(redis_client, fresh_urls, cache_ttl)
+    return urls
+
+
+async def get_signed_url(
+    s3_client: AioBaseClient,
+    redis_client: Redis | None,
+    key: str,
+    expires_in: int = 3600,
+) -> dict[str, str]:
     """
     Generate a signed URL for an object.
     """
@@ -271,19 +1099,19 @@ async def get_signed_url(key: str, expires_in: int = 3600):
         if not key:
             raise HTTPException(status_code=400, detail="Object key is required")
         if expires_in < 1 or expires_in > 604800:
-            raise HTTPException(status_code=400, detail="expires_in must be between 1 and 604800 seconds")
+            raise HTTPException(
+                status_code=400,
+                detail="expires_in must be between 1 and 604800 seconds",
+            )
 
-        signed_url = s3_client.generate_presigned_url(
-            ClientMethod="get_object",
-            Params={
-                "Bucket": BUCKET_NAME,
-                "Key": key
-            },
-            ExpiresIn=expires_in
-        )
+        signed_url = (
+            await presign_get_urls(s3_client, redis_client, [key], expires_in)
+        )[0]
         return {"signedUrl": signed_url}
+    except HTTPException:
+        raise
     except ClientError as e:
-        logger.error(f"Error generating signed URL for key {key}: {str(e)}")
+        logger.error("Error generating signed URL for key %s: %s", key, e)
         error_code = e.response.get("Error", {}).get("Code")
         if error_code == "NoSuchKey":
             raise HTTPException(status_code=404, detail="Object not found")
@@ -291,10 +1119,46 @@ async def get_signed_url(key: str, expires_in: int = 3600):
             raise HTTPException(status_code=403, detail="Access denied to the object")
         raise HTTPException(status_code=500, detail=f"Storage error: {str(e)}")
     except Exception as e:
-        logger.error(f"Unexpected error generating signed URL: {str(e)}")
+        logger.error("Unexpected error generating signed URL: %s", e)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+async def get_signed_urls(
+    s3_client: AioBaseClient,
+    redis_client: Redis | None,
+    keys: list[str],
+    expires_in: int = 3600,
+) -> dict[str, dict[str, str]]:
+    """
+    Generate signed URLs for many objects in one request, returned as a key -> URL map.
+    """
+    if not keys or not all(keys):
+        raise HTTPException(
+            status_code=400, detail="Non-empty object keys are required"
+        )
+    if len(keys) > MAX_SIGN_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_SIGN_BATCH_SIZE} keys can be signed per request",
+        )
+    if expires_in < 1 or expires_in > 604800:
+        raise HTTPException(
+            status_code=400, detail="expires_in must be between 1 and 604800 seconds"
+        )
+    try:
+        unique_keys = list(dict.fromkeys(keys))
+        signed_urls = await presign_get_urls(
+            s3_client, redis_client, unique_keys, expires_in
+        )
+        return {"signedUrls": dict(zip(unique_keys, signed_urls, strict=True))}
+    except Exception as e:
+        logger.error("Unexpected error generating signed URLs: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
-async def upload_file(file: UploadFile, path: str):
+
+async def upload_file(
+    s3_client: AioBaseClient, redis_client: Redis | None, file: UploadFile, path: str
+) -> dict[str, Any]:
     """
     Upload a file to S3 with robust error handling and validation, and update JSON store.
     """
@@ -302,314 +1166,501 @@ async def upload_file(file: UploadFile, path: str):
         if not file.filename:
             logger.error("No filename provided for upload")
             raise HTTPException(status_code=400, detail="No filename provided")
-            
+
         if not path:
             logger.error("No destination path provided")
             raise HTTPException(status_code=400, detail="No destination path provided")
-            
-        MAX_FILE_SIZE = 100 * 1024 * 1024  # 100MB
-        file_size = 0
-        file.file.seek(0, os.SEEK_END)
-        file_size = file.file.tell()
-        file.file.seek(0)
-        if file_size > MAX_FILE_SIZE:
-            logger.error(f"File size {file_size} exceeds maximum {MAX_FILE_SIZE}")
-            raise HTTPException(status_code=400, detail=f"File size exceeds {MAX_FILE_SIZE} bytes")
-        if file_size == 0:
+
+        # Starlette records the size while parsing the form; reject early when it is known
+        if file.size is not None and file.size > MAX_UPLOAD_SIZE:
+            logger.error("File size %d exceeds maximum %d", file.size, MAX_UPLOAD_SIZE)
+            raise HTTPException(
+                status_code=413, detail=f"File size exceeds {MAX_UPLOAD_SIZE} bytes"
+            )
+        if file.size == 0:
             logger.error("Empty file provided")
             raise HTTPException(status_code=400, detail="Empty file provided")
-            
+
         sanitized_path = sanitize_path(path)
-        
+
         content_type = file.content_type
         if not content_type or content_type == "application/octet-stream":
             content_type, _ = mimetypes.guess_type(file.filename)
             content_type = content_type or "application/octet-stream"
-        
+
         extra_args = {
             "ContentType": content_type,
             "Metadata": {
                 "original_filename": file.filename,
-                "upload_timestamp": str(int(os.times().elapsed))
-            }
+                "upload_timestamp": str(int(time.time())),  # Unix epoch seconds
+            },
         }
-        
-        logger.info(f"Uploading file {file.filename} to s3://{BUCKET_NAME}/{sanitized_path}")
-        
-        response = s3_client.upload_fileobj(
-            Fileobj=file.file,
-            Bucket=BUCKET_NAME,
-            Key=sanitized_path,
-            ExtraArgs=extra_args
+
+        logger.debug(
+            "Uploading file %s to s3://%s/%s",
+            file.filename,
+            BUCKET_NAME,
+            sanitized_path,
         )
-        
-        try:
-            head_response = s3_client.head_object(Bucket=BUCKET_NAME, Key=sanitized_path)
-            # Update JSON store
-            new_object = {
-                "type": "file",
-                "name": file.filename,
-                "path": sanitized_path,
-                "size": file_size,
-                "lastModified": head_response["LastModified"].isoformat(),
-                "count": None
-            }
-            await update_json_store([new_object])
-        except ClientError as e:
-            logger.error(f"Verification failed for {sanitized_path}: {str(e)}")
-            raise HTTPException(status_code=500, detail="Upload verification failed")
-            
-        logger.info(f"Successfully uploaded {file.filename} to {sanitized_path}")
+
+        if (
+            file.size is not None
+            and file.size < UPLOAD_TRANSFER_CONFIG.multipart_threshold
+        ):
+            # Single PUT; its response already confirms the write, so no HEAD follows.
+            # The body goes as bytes: aiohttp only streams io.IOBase objects, and on Python 3.10
+            # Starlette's SpooledTemporaryFile isn't one
+            body = await file.read()
+            response = await s3_client.put_object(
+                Bucket=BUCKET_NAME,
+                Key=sanitized_path,
+                Body=body,
+                ContentLength=len(body),
+                **extra_args,
+            )
+            if response["ResponseMetadata"][
+                "HTTPStatusCode"
+            ] != 200 or not response.get("ETag"):
+                logger.error(
+                    "Verification failed for %s: %s",
+                    sanitized_path,
+                    response["ResponseMetadata"],
+                )
+                raise HTTPException(
+                    status_code=500, detail="Upload verification failed"
+                )
+            file_size = len(body)
+        else:
+            # Multipart; CompleteMultipartUpload raises if S3 did not assemble the object.
+            # The reader enforces the limit and sizes the upload as it streams, without a seek
+            reader = SizeLimitedReader(file.file, MAX_UPLOAD_SIZE)
+            await s3_client.upload_fileobj(
+                reader,
+                BUCKET_NAME,
+                sanitized_path,
+                ExtraArgs=extra_args,
+                Config=UPLOAD_TRANSFER_CONFIG,
+            )
+            file_size = reader.bytes_read
+
+        # Update JSON store
+        new_object = {
+            "type": "file",
+            "name": file.filename,
+            "path": sanitized_path,
+            "size": file_size,
+            "lastModified": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "count": None,
+        }
+        await update_json_store(s3_client, [new_object])
+
+        await invalidate_folder_caches(redis_client, [sanitized_path])
+        logger.debug("Successfully uploaded %s to %s", file.filename, sanitized_path)
         return {
             "message": f"File uploaded successfully to {sanitized_path}",
             "filename": file.filename,
             "content_type": content_type,
-            "size": file_size
+            "size": file_size,
         }
-        
+
     except ClientError as e:
         error_code = e.response.get("Error", {}).get("Code", "Unknown")
         error_message = e.response.get("Error", {}).get("Message", str(e))
-        logger.error(f"S3 error uploading to {path}: {error_code} - {error_message}")
+        logger.error(
+            "S3 error uploading to %s: %s - %s", path, error_code, error_message
+        )
         if error_code == "NoSuchBucket":
             raise HTTPException(status_code=500, detail="Storage bucket does not exist")
         elif error_code in ("AccessDenied", "Forbidden"):
-            raise HTTPException(status_code=403, detail="Insufficient permissions to upload file")
+            raise HTTPException(
+                status_code=403, detail="Insufficient permissions to upload file"
+            )
         else:
-            raise HTTPException(status_code=500, detail=f"Storage error: {error_message}")
-            
+            raise HTTPException(
+                status_code=500, detail=f"Storage error: {error_message}"
+            )
+
+    except HTTPException:
+        raise
+
     except ValueError as e:
-        logger.error(f"Path validation error: {str(e)}")
-        raise HTTPException(status_code=400, detail=f"Invalid path: {str(e)}")
-        
+        logger.error("Path validation error: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+
     except Exception as e:
-        logger.error(f"Unexpected error uploading file to {path}: {str(e)}")
+        logger.error("Unexpected error uploading file to %s: %s", path, e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
-async def delete_objects(paths: List[str]):
+
+async def delete_batch(
+    s3_client: AioBaseClient, batch: list[dict[str, str]]
+) -> list[dict[str, str]]:
+    """
+    Delete up to DELETE_BATCH_SIZE objects in one request and return the per-key errors.
+    """
+    async with delete_semaphore:
+        response = await s3_client.delete_objects(
+            Bucket=BUCKET_NAME, Delete={"Objects": batch, "Quiet": True}
+        )
+    errors: list[dict[str, str]] = response.get("Errors", [])
+    return errors
+
+
+async def remove_from_json_store(
+    s3_client: AioBaseClient, deleted_keys: set[str]
+) -> None:
+    """
+    Remove deleted objects from the JSON store. Failures are logged rather than raised,
+    since the objects themselves are already gone.
+    """
+    try:
+        # Read current JSON store
+        current_store = await read_json_store(s3_client)
+        current_objects = current_store.get("objects", [])
+
+        # Filter out deleted objects
+        updated_objects = [
+            obj for obj in current_objects if obj["path"] not in deleted_keys
+        ]
+
+        # Write updated JSON store
+        json_data = await asyncio.to_thread(
+            orjson.dumps,
+            {
+                "objects": updated_objects,
+                "hasMore": False,
+                "nextContinuationToken": None,
+            },
+        )
+        await s3_client.put_object(
+            Bucket=BUCKET_NAME,
+            Key=JSON_STORE_PATH,
+            Body=json_data,
+            ContentType="application/json",
+        )
+        logger.debug("Synced JSON store after deleting %d objects", len(deleted_keys))
+    except Exception as e:
+        logger.error("Error syncing JSON store after deletion: %s", e)
+
+
+async def delete_objects(
+    s3_client: AioBaseClient, redis_client: Redis | None, paths: list[str]
+) -> dict[str, str]:
     try:
         if not paths:
             raise HTTPException(status_code=400, detail="No paths provided")
-        
+
         sanitized_paths = [sanitize_path(path) for path in paths]
-        objects_to_delete = []
+        objects_to_delete: list[dict[str, str]] = []
+        paginator = s3_client.get_paginator("list_objects_v2")
         for path in sanitized_paths:
             if path.endswith("/"):
-                continuation_token = None
-                while True:
-                    response = s3_client.list_objects_v2(
-                        Bucket=BUCKET_NAME,
-                        Prefix=path,
-                        MaxKeys=1000,
-                        ContinuationToken=continuation_token
+                async for response in paginator.paginate(
+                    Bucket=BUCKET_NAME,
+                    Prefix=path,
+                    FetchOwner=False,
+                    PaginationConfig={"PageSize": 1000},
+                ):
+                    objects_to_delete.extend(
+                        {"Key": obj["Key"]} for obj in response.get("Contents", [])
                     )
-                    for obj in response.get("Contents", []):
-                        objects_to_delete.append({"Key": obj["Key"]})
-                    continuation_token = response.get("NextContinuationToken")
-                    if not continuation_token:
-                        break
             else:
                 objects_to_delete.append({"Key": path})
-        
+
         if not objects_to_delete:
             return {"message": "No objects to delete"}
-        
-        # Perform the deletion
-        response = s3_client.delete_objects(
-            Bucket=BUCKET_NAME,
-            Delete={"Objects": objects_to_delete, "Quiet": True}
+
+        # Perform the deletion, DELETE_BATCH_SIZE keys per request. A failed batch doesn't
+        # cancel the others, so caches and the JSON store are synced for whatever was deleted
+        batches = [
+            objects_to_delete[i : i + DELETE_BATCH_SIZE]
+            for i in range(0, len(objects_to_delete), DELETE_BATCH_SIZE)
+        ]
+        batch_results = await asyncio.gather(
+            *(delete_batch(s3_client, batch) for batch in batches),
+            return_exceptions=True,
         )
-        
-        errors = response.get("Errors", [])
-        if errors:
-            error_details = ", ".join([f"{err['Key']}: {err['Message']}" for err in errors])
-            raise HTTPException(status_code=500, detail=f"Failed to delete some objects: {error_details}")
-        
-        # Sync JSON store: Remove deleted objects
-        try:
-            # Read current JSON store
-            current_store = await read_json_store()
-            current_objects = current_store.get("objects", [])
-            
-            # Filter out deleted objects
-            deleted_keys = {obj["Key"] for obj in objects_to_delete}
-            updated_objects = [obj for obj in current_objects if obj["path"] not in deleted_keys]
-            
-            # Write updated JSON store
-            json_data = json.dumps({
-                "objects": updated_objects,
-                "hasMore": False,
-                "nextContinuationToken": None
-            })
-            s3_client.put_object(
-                Bucket=BUCKET_NAME,
-                Key=JSON_STORE_PATH,
-                Body=json_data.encode("utf-8"),
-                ContentType="application/json"
+        failed_keys: set[str] = set()
+        error_details: list[str] = []
+        for batch, result in zip(batches, batch_results, strict=True):
+            if isinstance(result, BaseException):
+                logger.error(
+                    "Error deleting batch of %d objects starting at %s: %s",
+                    len(batch),
+                    batch[0]["Key"],
+                    result,
+                )
+                failed_keys.update(obj["Key"] for obj in batch)
+                error_details.append(
+                    f"{len(batch)} objects from {batch[0]['Key']}: {result}"
+                )
+            else:
+                failed_keys.update(err["Key"] for err in result)
+                error_details.extend(
+                    f"{err['Key']}: {err['Message']}" for err in result
+                )
+        deleted_keys = {
+            obj["Key"] for obj in objects_to_delete if obj["Key"] not in failed_keys
+        }
+        if deleted_keys:
+            await invalidate_folder_caches(redis_client, list(deleted_keys))
+            await remove_from_json_store(s3_client, deleted_keys)
+
+        if error_details:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to delete some objects ({len(failed_keys)} of {len(objects_to_delete)}): {', '.join(error_details)}",
             )
-            logger.info(f"Synced JSON store after deleting {len(objects_to_delete)} objects")
-        except Exception as e:
-            logger.error(f"Error syncing JSON store after deletion: {str(e)}")
-            # Note: We don't raise an exception here to avoid failing the deletion
-            # The deletion was successful, so we log the sync error but proceed
-            
         return {"message": f"Successfully deleted {len(objects_to_delete)} objects"}
-    
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.error("Path validation error: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
     except ClientError as e:
-        logger.error(f"Error deleting objects: {str(e)}")
+        logger.error("Error deleting objects: %s", e)
         raise HTTPException(status_code=500, detail=f"Storage error: {str(e)}")
     except Exception as e:
-        logger.error(f"Unexpected error deleting objects: {str(e)}")
+        logger.error("Unexpected error deleting objects: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
-async def export_to_csv(prefix: str = ""):
+
+class CsvChunk:
+    """
+    Write target for csv.writer that collects formatted lines until the next flush.
+    """
+
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+        self.write = self.lines.append
+
+    def flush(self) -> str:
+        chunk = "".join(self.lines)
+        self.lines.clear()
+        return chunk
+
+
+def format_export_page(
+    folder_rows: list[tuple[Any, ...]], contents: list[dict[str, Any]], prefix_len: int
+) -> str:
+    """
+    Format one listing page of the CSV export. Rows go to writerows as tuples, so a page is
+    formatted without building a dict per object. Runs in a worker thread with its own writer.
+    """
+    chunk = CsvChunk()
+    writer = csv.writer(chunk)
+    writer.writerows(folder_rows)
+    writer.writerows(
+        ("file", file_name, key, obj["Size"], obj["LastModified"].isoformat(), "")
+        for obj in contents
+        if (file_name := (key := obj["Key"])[prefix_len:])
+    )
+    return chunk.flush()
+
+
+async def export_csv_rows(
+    s3_client: AioBaseClient,
+    redis_client: Redis | None,
+    prefix: str,
+    first_page: dict[str, Any],
+    pages: AsyncIterator[dict[str, Any]],
+) -> AsyncIterator[str]:
     """
-    Export object list to CSV.
+    Yield the CSV export one listing page at a time, starting with the already fetched first page.
     """
+    prefix_len = len(prefix)
+    header = CsvChunk()
+    csv.writer(header).writerow(
+        ("type", "name", "path", "size", "lastModified", "count")
+    )
+    yield header.flush()
+    response: dict[str, Any] | None = first_page
     try:
-        # Fetch all objects
-        objects = []
-        continuation_token = None
-        while True:
-            params = {
-                "Bucket": BUCKET_NAME,
-                "Prefix": prefix,
-                "Delimiter": "/",
-                "MaxKeys": 1000,
-            }
-            if continuation_token:
-                params["ContinuationToken"] = continuation_token
-            response = s3_client.list_objects_v2(**params)
+        while response is not None:
+            folder_entries = [
+                (folder_name, folder_path)
+                for common_prefix in response.get("CommonPrefixes", ())
+                if (
+                    folder_name := folder_basename(
+                        folder_path := common_prefix["Prefix"]
+                    )
+                )
+            ]
+            counts = await get_folder_counts(
+                s3_client,
+                redis_client,
+                prefix,
+                [folder_path for _, folder_path in folder_entries],
+            )
+            folder_rows = [
+                ("folder", folder_name, folder_path, "", "", count)
+                for (folder_name, folder_path), count in zip(
+                    folder_entries, counts, strict=True
+                )
+            ]
+            # Formatting a full page of rows is CPU work; keep it off the event loop
+            yield await asyncio.to_thread(
+                format_export_page,
+                folder_rows,
+                response.get("Contents", ()),
+                prefix_len,
+            )
+            response = await anext(pages, None)
+    except Exception as e:
+        # Headers are already sent, so the best we can do is cut the download short
+        logger.error("Error streaming CSV export for %s: %s", prefix, e)
+        raise
 
-            # Process folders
-            for common_prefix in response.get("CommonPrefixes", []):
-                folder_path = common_prefix["Prefix"]
-                folder_name = folder_path.rstrip("/").split("/")[-1]
-                if folder_name:
-                    count = await get_folder_count(folder_path)
-                    objects.append({
-                        "type": "folder",
-                        "name": folder_name,
-                        "path": folder_path,
-                        "size": None,
-                        "lastModified": None,
-                        "count": count
-                    })
 
-            # Process files
-            for obj in response.get("Contents", []):
-                key = obj["Key"]
-                if key != prefix and not key.endswith("/"):
-                    file_name = key.replace(prefix, "", 1).lstrip("/")
-                    if file_name:
-                        objects.append({
-                            "type": "file",
-                            "name": file_name,
-                            "path": key,
-                            "size": obj["Size"],
-                            "lastModified": obj["LastModified"].isoformat(),
-                            "count": None
-                        })
+async def export_to_csv(
+    s3_client: AioBaseClient, redis_client: Redis | None, prefix: str = ""
+) -> StreamingResponse:
+    """
+    Export object list to CSV, streamed to the client as each listing page arrives.
+    """
+    try:
+        paginator = s3_client.get_paginator("list_objects_v2")
+        pages = paginator.paginate(**folder_walk_params(prefix)).__aiter__()
+        # Fetch the first page before responding so storage errors still get a proper status
+        first_page = await anext(pages)
 
-            continuation_token = response.get("NextContinuationToken")
-            if not continuation_token:
-                break
-
-        # Create CSV
-        output = StringIO()
-        writer = csv.DictWriter(output, fieldnames=["type", "name", "path", "size", "lastModified", "count"])
-        writer.writeheader()
-        for obj in objects:
-            writer.writerow({
-                "type": obj["type"],
-                "name": obj["name"],
-                "path": obj["path"],
-                "size": obj["size"] if obj["size"] is not None else "",
-                "lastModified": obj["lastModified"] if obj["lastModified"] is not None else "",
-                "count": obj["count"] if obj["count"] is not None else ""
-            })
-
-        return Response(
-            content=output.getvalue(),
+        return StreamingResponse(
+            export_csv_rows(s3_client, redis_client, prefix, first_page, pages),
             media_type="text/csv",
-            headers={"Content-Disposition": f"attachment; filename=file_list_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"}
+            headers={
+                "Content-Disposition": f"attachment; filename=file_list_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
+            },
         )
 
-    except s3_client.exceptions.NoSuchBucket as e:
-        logger.error(f"Bucket not found: {str(e)}")
-        raise HTTPException(status_code=404, detail="Bucket not found")
-    except s3_client.exceptions.ClientError as e:
-        logger.error(f"Client error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Storage error: {str(e)}")
+    except ClientError as e:
+        raise listing_error(e)
     except Exception as e:
-        logger.error(f"Unexpected error exporting CSV: {str(e)}")
+        logger.error("Unexpected error exporting CSV: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
-# S3 Endpoints
-@s3_router.get("/list")
-async def s3_list_objects(
-    prefix: str = "",
-    page: int = 1,
-    page_size: int = 10,
-    continuation_token: Optional[str] = None
-):
-    return await list_objects(prefix, page, page_size, continuation_token)
 
-@s3_router.get("/sign")
-async def s3_get_signed_url(key: str, expires_in: int = 3600):
-    return await get_signed_url(key, expires_in)
+# Endpoints
+def make_router(url_prefix: str, tag: str) -> APIRouter:
+    """
+    Build the storage endpoints shared by the S3 and R2 routers; both talk to the same bucket.
+    """
+    router = APIRouter(prefix=url_prefix, tags=[tag], route_class=BodySizeLimitRoute)
+
+    @router.get("/list", response_class=ORJSONResponse, name=f"{tag}_list_objects")
+    async def list_objects_route(
+        s3_client: S3ClientDep,
+        redis_client: RedisDep,
+        prefix: str = "",
+        page: int = 1,
+        page_size: int = 10,
+        continuation_token: str | None = None,
+        include_counts: bool = False,
+    ) -> ORJSONResponse:
+        # Returned directly so the page skips jsonable_encoder and goes straight to orjson
+        return ORJSONResponse(
+            await list_objects(
+                s3_client,
+                redis_client,
+                prefix,
+                page,
+                page_size,
+                continuation_token,
+                include_counts,
+            ),
+            headers={"Cache-Control": LIST_CACHE_CONTROL},
+        )
+
+    @router.get("/folder-count", name=f"{tag}_get_folder_count")
+    async def folder_count_route(
+        s3_client: S3ClientDep,
+        redis_client: RedisDep,
+        prefix: str = Query(...),
+        exact: bool = True,
+    ) -> Any:
+        if exact:
+            return {
+                "prefix": prefix,
+                "count": await get_folder_count(s3_client, redis_client, prefix),
+            }
+        return {
+            "prefix": prefix,
+            "count": await estimate_folder_count(s3_client, redis_client, prefix),
+        }
+
+    @router.get(
+        "/list_sharded",
+        response_class=ORJSONResponse,
+        name=f"{tag}_list_objects_sharded",
+    )
+    async def list_objects_sharded_route(
+        s3_client: S3ClientDep,
+        shards: list[str] = Query(...),
+        prefix: str = "",
+        max_parallel_listings: int = MAX_PARALLEL_LISTINGS,
+    ) -> ORJSONResponse:
+        return ORJSONResponse(
+            await list_objects_sharded(s3_client, prefix, shards, max_parallel_listings)
+        )
 
-@s3_router.post("/upload")
-async def s3_upload_file(
-    file: UploadFile = File(...),
-    path: str = Query(...)
-):
-    return await upload_file(file, path)
+    @router.get("/sign", name=f"{tag}_get_signed_url")
+    async def signed_url_route(
+        s3_client: S3ClientDep, redis_client: RedisDep, key: str, expires_in: int = 3600
+    ) -> Any:
+        return await get_signed_url(s3_client, redis_client, key, expires_in)
 
-@s3_router.post("/delete")
-async def s3_delete_objects(request: DeleteRequest):
-    return await delete_objects(request.paths)
+    @router.post(
+        "/sign_batch", response_class=ORJSONResponse, name=f"{tag}_get_signed_urls"
+    )
+    async def signed_urls_route(
+        s3_client: S3ClientDep, redis_client: RedisDep, request: SignBatchRequest
+    ) -> ORJSONResponse:
+        return ORJSONResponse(
+            await get_signed_urls(
+                s3_client, redis_client, request.keys, request.expires_in
+            )
+        )
 
-@s3_router.get("/export-csv")
-async def s3_export_to_csv(prefix: str = ""):
-    return await export_to_csv(prefix)
+    @router.post("/upload", name=f"{tag}_upload_file")
+    async def upload_file_route(
+        s3_client: S3ClientDep,
+        redis_client: RedisDep,
+        file: UploadFile = File(...),
+        path: str = Query(...),
+    ) -> Any:
+        return await upload_file(s3_client, redis_client, file, path)
+
+    @router.post("/delete", name=f"{tag}_delete_objects")
+    async def delete_objects_route(
+        s3_client: S3ClientDep, redis_client: RedisDep, request: DeleteRequest
+    ) -> Any:
+        return await delete_objects(s3_client, redis_client, request.paths)
+
+    @router.get("/export-csv", name=f"{tag}_export_to_csv")
+    async def export_to_csv_route(
+        s3_client: S3ClientDep, redis_client: RedisDep, prefix: str = ""
+    ) -> StreamingResponse:
+        return await export_to_csv(s3_client, redis_client, prefix)
+
+    return router
+
+
+s3_router = make_router("/s3", "s3")
+r2_router = make_router("/r2", "r2")
+
+
+# JSON store endpoints (S3 only)
+@s3_router.get("/json-store", response_class=ORJSONResponse)
+async def get_json_store(s3_client: S3ClientDep) -> ORJSONResponse:
+    # The store lists every object in the bucket; skip jsonable_encoder and go straight to orjson
+    return ORJSONResponse(await read_json_store(s3_client))
 
-@s3_router.get("/json-store")
-async def get_json_store():
-    return await read_json_store()
 
 @s3_router.post("/sync-json-store")
-async def sync_json_store(prefix: str = ""):
+async def sync_json_store(
+    s3_client: S3ClientDep, redis_client: RedisDep, prefix: str = ""
+) -> Any:
     """
     One-time endpoint to sync existing S3 objects to the JSON store.
     """
-    return await sync_existing_objects(prefix)
-
-# R2 Endpoints
-@r2_router.get("/list")
-async def r2_list_objects(
-    prefix: str = "",
-    page: int = 1,
-    page_size: int = 10,
-    continuation_token: Optional[str] = None
-):
-    return await list_objects(prefix, page, page_size, continuation_token)
-
-@r2_router.get("/sign")
-async def r2_get_signed_url(key: str, expires_in: int = 3600):
-    return await get_signed_url(key, expires_in)
-
-@r2_router.post("/upload")
-async def r2_upload_file(
-    file: UploadFile = File(...),
-    path: str = Depends(lambda x: x.query_params.get("path"))
-):
-    return await upload_file(file, path)
-
-@r2_router.post("/delete")
-async def r2_delete_objects(request: DeleteRequest):
-    return await delete_objects(request.paths)
-
-@r2_router.get("/export-csv")
-async def r2_export_to_csv(prefix: str = ""):
-    return await export_to_csv(prefix)
\ No newline at end of file
+    return await sync_existing_objects(s3_client, redis_client, prefix)
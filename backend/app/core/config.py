@@ -7,6 +7,7 @@ from pydantic import (
     BeforeValidator,
     HttpUrl,
     PostgresDsn,
+    RedisDsn,
     computed_field,
     model_validator,
 )
@@ -68,6 +69,14 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    # Cloudflare R2 (S3-compatible) object storage
+    R2_ENDPOINT: str
+    R2_ACCESS_KEY_ID: str
+    R2_SECRET_ACCESS_KEY: str
+
+    # Shared cache for S3 listing results; caching is disabled when unset
+    REDIS_URL: RedisDsn | None = None
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
@@ -115,6 +124,7 @@ class Settings(BaseSettings):
         self._check_default_secret(
             "FIRST_SUPERUSER_PASSWORD", self.FIRST_SUPERUSER_PASSWORD
         )
+        self._check_default_secret("R2_SECRET_ACCESS_KEY", self.R2_SECRET_ACCESS_KEY)
 
         return self
 
@@ -0,0 +1,449 @@
+import asyncio
+import hashlib
+import io
+from collections.abc import AsyncIterator
+from typing import Any
+
+import orjson
+import pytest
+from botocore.exceptions import ClientError
+from cachetools import TLRUCache
+from fastapi import HTTPException, UploadFile
+
+from app.api.routes import s3
+
+
+class FakeBody:
+    def __init__(self, content: bytes) -> None:
+        self.content = content
+
+    async def __aenter__(self) -> "FakeBody":
+        return self
+
+    async def __aexit__(self, *_exc: Any) -> None:
+        pass
+
+    async def read(self) -> bytes:
+        return self.content
+
+
+class FakeS3Client:
+    """
+    In-memory stand-in for the listing and object calls of an S3 client.
+    Listings ignore Delimiter, so tests that list pages use flat folders.
+    """
+
+    def __init__(self, keys: list[str], max_keys: int = 1000) -> None:
+        self.keys = sorted(keys)
+        self.max_keys = max_keys
+        self.list_calls = 0
+        self.sign_calls = 0
+        self.last_list_params: dict[str, Any] = {}
+        self.objects: dict[str, bytes] = {}
+        # Keys DeleteObjects reports as errors, and keys whose whole batch request fails
+        self.undeletable_keys: set[str] = set()
+        self.failing_batch_keys: set[str] = set()
+
+    async def get_object(self, **params: Any) -> dict[str, Any]:
+        if params["Key"] not in self.objects:
+            raise ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+        return {"Body": FakeBody(self.objects[params["Key"]])}
+
+    async def put_object(self, **params: Any) -> dict[str, Any]:
+        body = params["Body"]
+        # aiohttp only streams bytes or io.IOBase objects
+        if isinstance(body, io.IOBase):
+            body = body.read()
+        if not isinstance(body, bytes | bytearray):
+            raise TypeError(
+                f"Only io.IOBase, bytes or bytearray is accepted, got {type(body)}"
+            )
+        self.objects[params["Key"]] = bytes(body)
+        return {"ResponseMetadata": {"HTTPStatusCode": 200}, "ETag": '"etag"'}
+
+    async def delete_objects(self, **params: Any) -> dict[str, Any]:
+        keys = [obj["Key"] for obj in params["Delete"]["Objects"]]
+        if self.failing_batch_keys.intersection(keys):
+            raise ClientError(
+                {"Error": {"Code": "SlowDown", "Message": "slow down"}}, "DeleteObjects"
+            )
+        errors = [
+            {"Key": key, "Code": "AccessDenied", "Message": "Access Denied"}
+            for key in keys
+            if key in self.undeletable_keys
+        ]
+        self.keys = [
+            key for key in self.keys if key not in keys or key in self.undeletable_keys
+        ]
+        return {"Errors": errors} if errors else {}
+
+    async def list_objects_v2(self, **params: Any) -> dict[str, Any]:
+        self.list_calls += 1
+        self.last_list_params = params
+        start_after = params.get("ContinuationToken") or params.get("StartAfter", "")
+        matching = [
+            key
+            for key in self.keys
+            if key.startswith(params.get("Prefix", "")) and key > start_after
+        ]
+        page = matching[: min(params.get("MaxKeys", 1000), self.max_keys)]
+        response: dict[str, Any] = {
+            "Contents": [
+                {"Key": key, "Size": 1, "LastModified": "2024-01-01T00:00:00+00:00"}
+                for key in page
+            ],
+            "KeyCount": len(page),
+            "IsTruncated": len(page) < len(matching),
+        }
+        if response["IsTruncated"]:
+            response["NextContinuationToken"] = page[-1]
+        return response
+
+    async def generate_presigned_url(self, **params: Any) -> str:
+        self.sign_calls += 1
+        return f"https://signed/{params['Params']['Key']}?n={self.sign_calls}"
+
+    def get_paginator(self, _operation: str) -> "FakePaginator":
+        return FakePaginator(self)
+
+
+class FakePaginator:
+    def __init__(self, client: FakeS3Client) -> None:
+        self.client = client
+
+    async def paginate(self, **params: Any) -> AsyncIterator[dict[str, Any]]:
+        params.pop("PaginationConfig", None)
+        while True:
+            page = await self.client.list_objects_v2(**params)
+            yield page
+            if "NextContinuationToken" not in page:
+                return
+            params["ContinuationToken"] = page["NextContinuationToken"]
+
+
+class FakeRedis:
+    """In-memory stand-in for the Redis commands used by the cache helpers; expiry is ignored."""
+
+    def __init__(self) -> None:
+        self.values: dict[str, bytes] = {}
+        self.ttls: dict[str, int] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        return self.values.get(key)
+
+    async def mget(self, keys: list[str]) -> list[bytes | None]:
+        return [self.values.get(key) for key in keys]
+
+    async def setex(self, key: str, ttl: int, value: str | int) -> None:
+        self.values[key] = str(value).encode()
+        self.ttls[key] = ttl
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.values.pop(key, None)
+
+    def incr(self, key: str) -> None:
+        self.values[key] = str(int(self.values.get(key, b"0")) + 1).encode()
+
+    def expire(self, key: str, ttl: int) -> None:
+        self.ttls[key] = ttl
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis) -> None:
+        self.redis = redis
+        self.commands: list[Any] = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *_exc: Any) -> None:
+        pass
+
+    def __getattr__(self, name: str) -> Any:
+        return lambda *args: self.commands.append((name, args))
+
+    async def execute(self) -> None:
+        for name, args in self.commands:
+            result = getattr(self.redis, name)(*args)
+            if asyncio.iscoroutine(result):
+                await result
+
+
+@pytest.fixture(autouse=True)
+def no_local_caches(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(s3, "folder_count_local_cache", {})
+    monkeypatch.setattr(s3, "list_page_cache", {})
+    monkeypatch.setattr(
+        s3,
+        "signed_url_local_cache",
+        TLRUCache(maxsize=100, ttu=s3.signed_url_local_cache.ttu),
+    )
+
+
+def test_count_all_subfolders_skips_direct_files() -> None:
+    client = FakeS3Client(["t2/a/1", "t2/b", "t2/b/1", "t2/c", "t2/c/1", "t2/c/2"])
+    counts, last_read = asyncio.run(s3.count_all_subfolders(client, "t2/", "a", "c"))
+    assert counts == {"a": 1, "b": 1, "c": 2}
+    assert last_read is None
+
+
+def test_get_folder_counts_matches_individual_counts() -> None:
+    keys = ["t2/a/1", "t2/b", "t2/b/1", "t2/c/1", "t2/c/2", "t2/d/1", "t2/e"]
+    folders = ["t2/a/", "t2/b/", "t2/c/", "t2/d/"]
+    client = FakeS3Client(keys)
+    shared = asyncio.run(s3.get_folder_counts(client, None, "t2/", folders))
+    assert client.list_calls == 1
+
+    s3.folder_count_local_cache.clear()
+    individual = [
+        asyncio.run(s3.get_folder_count(client, None, folder)) for folder in folders
+    ]
+    assert shared == individual == [1, 1, 2, 1]
+
+
+def test_get_folder_counts_finishes_folders_past_page_budget(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(s3, "BATCH_COUNT_MAX_PAGES", 2)
+    keys = [f"t2/{folder}/{i}" for folder in "abcd" for i in range(3)]
+    folders = [f"t2/{folder}/" for folder in "abcd"]
+    client = FakeS3Client(keys, max_keys=2)
+    counts, last_read = asyncio.run(s3.count_all_subfolders(client, "t2/", "a", "d"))
+    # Two pages of two keys end inside folder b, so only a is complete
+    assert last_read == "b/0"
+    assert counts["a"] == 3
+
+    assert asyncio.run(s3.get_folder_counts(client, None, "t2/", folders)) == [
+        3,
+        3,
+        3,
+        3,
+    ]
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ("a/b.txt", "a/b.txt"),
+        ("/a/b/", "a/b/"),
+        ("a//b", "a/b"),
+        ("//a///b//", "a/b/"),
+        ("./a/./b", "a/b"),
+        ("a\\b\\c.txt", "a/b/c.txt"),
+        ("..a", "..a"),
+        ("a/..b/c", "a/..b/c"),
+        ("a/.../b", "a/.../b"),
+    ],
+)
+def test_sanitize_path(path: str, expected: str) -> None:
+    assert s3.sanitize_path(path) == expected
+
+
+@pytest.mark.parametrize(
+    "path", ["..", "../a", "a/..", "a/../b", "a\\..\\b", "/a//../b"]
+)
+def test_sanitize_path_rejects_parent_segments(path: str) -> None:
+    with pytest.raises(ValueError):
+        s3.sanitize_path(path)
+
+
+@pytest.mark.parametrize("path", ["/", ".", "./", "//", "././/"])
+def test_sanitize_path_rejects_empty_result(path: str) -> None:
+    with pytest.raises(ValueError):
+        s3.sanitize_path(path)
+
+
+def test_delete_objects_rejects_bucket_root() -> None:
+    client = FakeS3Client(["a/1"])
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(s3.delete_objects(client, None, ["a/1", "/"]))
+    assert exc_info.value.status_code == 400
+    assert client.keys == ["a/1"]
+
+
+class NonIOBaseFile:
+    """File-like object that, like SpooledTemporaryFile on Python 3.10, is not an io.IOBase."""
+
+    def __init__(self, content: bytes) -> None:
+        self.buffer = io.BytesIO(content)
+
+    def read(self, size: int = -1) -> bytes:
+        return self.buffer.read(size)
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self.buffer.seek(offset, whence)
+
+    def close(self) -> None:
+        self.buffer.close()
+
+
+def test_upload_file_sends_small_files_as_bytes() -> None:
+    client = FakeS3Client([])
+    file = UploadFile(NonIOBaseFile(b"hello"), size=5, filename="hello.txt")  # type: ignore[arg-type]
+    result = asyncio.run(s3.upload_file(client, None, file, "docs/hello.txt"))
+    assert result["size"] == 5
+    assert client.objects["docs/hello.txt"] == b"hello"
+    assert s3.JSON_STORE_PATH in client.objects
+
+
+def test_delete_objects_syncs_caches_and_store_for_deleted_keys_only(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(s3, "DELETE_BATCH_SIZE", 2)
+    keys = [f"docs/{name}" for name in "abcde"]
+    client = FakeS3Client([*keys, "other/f"])
+    # Batches are [a, b], [c, d] and [e]: a is refused, the [c, d] request fails outright
+    client.undeletable_keys = {"docs/a"}
+    client.failing_batch_keys = {"docs/c"}
+    client.objects[s3.JSON_STORE_PATH] = orjson.dumps(
+        {"objects": [{"path": key} for key in [*keys, "other/f"]]}
+    )
+    s3.folder_count_local_cache["docs/"] = 5
+    s3.folder_count_local_cache["other/"] = 1
+    s3.list_page_cache[("docs/", 1, 10, None, False, None)] = {"objects": []}
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(s3.delete_objects(client, None, ["docs/"]))
+
+    assert exc_info.value.status_code == 500
+    assert exc_info.value.detail.startswith("Failed to delete some objects (3 of 5): ")
+    assert "docs/a: Access Denied" in exc_info.value.detail
+    assert "2 objects from docs/c" in exc_info.value.detail
+    assert client.keys == ["docs/a", "docs/c", "docs/d", "other/f"]
+    store = orjson.loads(client.objects[s3.JSON_STORE_PATH])
+    assert [obj["path"] for obj in store["objects"]] == [
+        "docs/a",
+        "docs/c",
+        "docs/d",
+        "other/f",
+    ]
+    assert "docs/" not in s3.folder_count_local_cache
+    assert s3.folder_count_local_cache["other/"] == 1
+    assert not s3.list_page_cache
+
+
+def test_list_objects_rejects_invalid_page_with_400() -> None:
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(s3.list_objects(FakeS3Client([]), None, "t2/", page=0))
+    assert exc_info.value.status_code == 400
+
+
+def test_get_signed_url_rejects_invalid_expiry_with_400() -> None:
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(s3.get_signed_url(FakeS3Client([]), None, "a.txt", expires_in=0))
+    assert exc_info.value.status_code == 400
+
+
+def test_page_map_is_not_reused_after_folder_changes() -> None:
+    client = FakeS3Client([f"t2/{name}" for name in "abcdef"])
+    redis: Any = FakeRedis()
+
+    # Pages requested by number record where the next page starts
+    for page in (1, 2, 3):
+        asyncio.run(s3.list_objects(client, redis, "t2/", page, 2))
+    client.keys.remove("t2/a")
+    asyncio.run(s3.invalidate_folder_caches(redis, ["t2/a"]))
+
+    # Page 3 used to start after d; with a gone, that boundary is stale
+    asyncio.run(s3.list_objects(client, redis, "t2/", 3, 2))
+    assert "ContinuationToken" not in client.last_list_params
+
+
+def test_list_objects_page_one_ignores_continuation_token() -> None:
+    client = FakeS3Client([f"t2/{name}" for name in "abcd"])
+    result = asyncio.run(s3.list_objects(client, None, "t2/", 1, 2, "t2/b"))
+    assert [obj["path"] for obj in result["objects"]] == ["t2/a", "t2/b"]
+    assert "ContinuationToken" not in client.last_list_params
+
+
+def test_continuation_token_ids_round_trip_through_redis() -> None:
+    redis: Any = FakeRedis()
+    token_id = asyncio.run(s3.issue_continuation_token(redis, "t2/", "t2/b", "raw"))
+    assert token_id == hashlib.md5(b"t2/|t2/b", usedforsecurity=False).hexdigest()
+    assert redis.ttls[s3.token_id_cache_key(token_id)] == s3.PAGE_TOKEN_CACHE_TTL
+    # The same position always gets the same id
+    reissued = asyncio.run(s3.issue_continuation_token(redis, "t2/", "t2/b", "raw"))
+    assert reissued == token_id
+    assert asyncio.run(s3.resolve_continuation_token(redis, token_id)) == "raw"
+    unknown_id = "0" * 32
+    assert asyncio.run(s3.resolve_continuation_token(redis, unknown_id)) == unknown_id
+
+
+def test_continuation_tokens_pass_through_without_redis() -> None:
+    assert asyncio.run(s3.issue_continuation_token(None, "t2/", "t2/b", "raw")) == "raw"
+    assert asyncio.run(s3.resolve_continuation_token(None, "raw")) == "raw"
+
+
+@pytest.mark.parametrize("with_redis", [True, False])
+def test_list_objects_follows_issued_tokens(with_redis: bool) -> None:
+    client = FakeS3Client([f"t2/{name}" for name in "abcde"])
+    redis: Any = FakeRedis() if with_redis else None
+    first = asyncio.run(s3.list_objects(client, redis, "t2/", 1, 2))
+    token = first["nextContinuationToken"]
+    assert (len(token) == 32) is with_redis
+    second = asyncio.run(s3.list_objects(client, redis, "t2/", 2, 2, token))
+    assert [obj["path"] for obj in second["objects"]] == ["t2/c", "t2/d"]
+
+
+class FakeTimer:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_signed_urls_are_reused_until_safety_margin(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    timer = FakeTimer()
+    monkeypatch.setattr(
+        s3,
+        "signed_url_local_cache",
+        TLRUCache(maxsize=100, ttu=s3.signed_url_local_cache.ttu, timer=timer),
+    )
+    client = FakeS3Client([])
+
+    def sign() -> str:
+        return asyncio.run(s3.get_signed_url(client, None, "a.txt", 3600))["signedUrl"]
+
+    first = sign()
+    timer.now = 3600 - s3.SIGNED_URL_SAFETY_MARGIN - 1
+    assert sign() == first
+    assert client.sign_calls == 1
+    # Past this point the URL has less than the safety margin left, so it is re-signed
+    timer.now = 3600 - s3.SIGNED_URL_SAFETY_MARGIN
+    assert sign() != first
+    assert client.sign_calls == 2
+
+
+def test_signed_urls_are_shared_through_redis() -> None:
+    client = FakeS3Client([])
+    redis: Any = FakeRedis()
+    first = asyncio.run(s3.get_signed_url(client, redis, "a.txt", 3600))["signedUrl"]
+    cache_key = s3.signed_url_cache_key("a.txt", 3600)
+    assert redis.values[cache_key] == first.encode()
+    assert redis.ttls[cache_key] == 3600 - s3.SIGNED_URL_SAFETY_MARGIN
+
+    # Another worker, with nothing in its own memory, reuses the shared URL
+    s3.signed_url_local_cache.clear()
+    second = asyncio.run(s3.get_signed_url(client, redis, "a.txt", 3600))["signedUrl"]
+    assert second == first
+    assert client.sign_calls == 1
+
+
+def test_short_lived_signed_urls_are_not_cached() -> None:
+    client = FakeS3Client([])
+    redis: Any = FakeRedis()
+    expires_in = s3.SIGNED_URL_SAFETY_MARGIN
+    urls = asyncio.run(
+        s3.get_signed_urls(client, redis, ["a.txt", "a.txt"], expires_in)
+    )
+    assert list(urls["signedUrls"]) == ["a.txt"]
+    asyncio.run(s3.get_signed_url(client, redis, "a.txt", expires_in))
+    assert client.sign_calls == 2
+    assert not redis.values
@@ -1,6 +1,6 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { createFileRoute } from '@tanstack/react-router';
-import { useQuery, keepPreviousData, useMutation, useQueryClient } from '@tanstack/react-query';
+import { useQuery, useQueries, keepPreviousData, useMutation, useQueryClient } from '@tanstack/react-query';
 import {
   Box,
   Container,
@@ -64,7 +64,7 @@ interface S3Object {
   path: string;
   size?: number;
   lastModified?: Date;
-  count?: number;
+  count?: number | 'many';
 }
 
 interface S3ListResponse {
@@ -120,6 +120,28 @@ async function listObjects(
   }
 }
 
+async function getFolderCount(
+  prefix: string,
+  storageType: string = STORAGE_TYPE
+): Promise<number | 'many'> {
+  try {
+    const url = new URL(`${API_BASE_URL}/${storageType}/folder-count`);
+    url.searchParams.append('prefix', prefix);
+    // A single listing call; folders past its page come back as 'many'
+    url.searchParams.append('exact', 'false');
+
+    const response = await fetch(url);
+    if (!response.ok) {
+      const errorText = await response.text();
+      throw new Error(`Failed to count folder: ${errorText || response.statusText}`);
+    }
+    const data = await response.json();
+    return data.count;
+  } catch (error: any) {
+    throw new Error(`Failed to count folder: ${error.message || 'Network error'}`);
+  }
+}
+
 async function getSignedUrl(
   key: string,
   expiresIn: number = DEFAULT_EXPIRES_IN,
@@ -720,6 +742,7 @@ function FileExplorer() {
       uploadFile(file, path, state.storageType),
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['objects', state.currentPath] });
+      queryClient.invalidateQueries({ queryKey: ['folderCount'] });
       toast({
         title: 'Upload Successful',
         description: 'File(s) uploaded successfully.',
@@ -743,6 +766,7 @@ function FileExplorer() {
     mutationFn: (paths: string[]) => deleteObjects(paths, state.storageType),
     onSuccess: () => {
         queryClient.invalidateQueries({ queryKey: ['objects', state.currentPath] });
+        queryClient.invalidateQueries({ queryKey: ['folderCount'] });
         setSelectedPaths([]);
         setSelectedFile(null);
         setPreviewUrl('');
@@ -1049,12 +1073,31 @@ const handleDeleteSelected = () => {
     ];
   };
 
+  const matchesFilters = (obj: S3Object) => {
+    const matchesSearch = obj.name.toLowerCase().includes(state.searchQuery.toLowerCase());
+    const matchesType = state.typeFilter === 'all' || obj.type === state.typeFilter;
+    return matchesSearch && matchesType;
+  };
+
+  // Counts are fetched per shown folder; asking the listing for them would walk every folder on the page
+  const shownFolders = objects.filter((obj) => obj.type === 'folder' && matchesFilters(obj));
+  const folderCountQueries = useQueries({
+    queries: shownFolders.map((folder) => ({
+      queryKey: ['folderCount', folder.path, state.storageType],
+      queryFn: () => getFolderCount(folder.path, state.storageType),
+      retry: 1,
+      staleTime: 60 * 1000,
+    })),
+  });
+  const folderCounts = new Map(
+    shownFolders.map((folder, index) => [folder.path, folderCountQueries[index].data])
+  );
+  const countValue = (count?: number | 'many') =>
+    count === 'many' ? Number.MAX_SAFE_INTEGER : count || 0;
+
   const filteredObjects = objects
-    .filter((obj) => {
-      const matchesSearch = obj.name.toLowerCase().includes(state.searchQuery.toLowerCase());
-      const matchesType = state.typeFilter === 'all' || obj.type === state.typeFilter;
-      return matchesSearch && matchesType;
-    })
+    .filter(matchesFilters)
+    .map((obj) => (obj.type === 'folder' ? { ...obj, count: folderCounts.get(obj.path) } : obj))
     .sort((a, b) => {
       if (a.type === 'folder' && b.type === 'file') return -1;
       if (a.type === 'file' && b.type === 'folder') return 1;
@@ -1066,7 +1109,7 @@ const handleDeleteSelected = () => {
       } else if (state.sortField === 'lastModified') {
         comparison = (a.lastModified?.getTime() || 0) - (b.lastModified?.getTime() || 0);
       } else if (state.sortField === 'count') {
-        comparison = (a.count || 0) - (b.count || 0);
+        comparison = countValue(a.count) - countValue(b.count);
       }
       return state.sortOrder === 'asc' ? comparison : -comparison;
     });